@@ -0,0 +1,27 @@
+
+# Response renderers for the task analyzer API.
+
+# ORJSONRenderer swaps DRF's stdlib-json renderer for orjson, which encodes
+# dict/list payloads several times faster and handles datetime.date and
+# NumPy scalar values natively, without per-field default callbacks.
+
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+
+
+class ORJSONRenderer(BaseRenderer):
+
+    media_type = 'application/json'
+    format = 'json'
+
+    # orjson returns bytes; no charset so DRF doesn't try to re-encode
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC,
+        )
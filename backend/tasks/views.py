@@ -4,16 +4,73 @@ from rest_framework.response import Response
 from rest_framework import status
 from .serializers import TaskSerializer
 from .scoring import compute_scores, detect_cycles
-from datetime import datetime
-import copy
+from .renderers import ORJSONRenderer
 
 
+# Shared pipeline for both endpoints: validate the raw task batch, rewrite
+# dependency titles to IDs, reject circular dependencies, then score.
+# Returns (scored, validated, None) on success, or (None, None, response)
+# where response is the 400 to send back.
+
+def _prepare_and_score(raw_tasks, weights, strategy, top_k=None, include_explanation=True):
+
+    # Validate the whole batch in one serializer pass; DRF's ListSerializer
+    # binds the fields once instead of rebuilding them per task
+    serializer = TaskSerializer(data=raw_tasks, many=True)
+
+    if not serializer.is_valid():
+        # ListSerializer errors are keyed by item index (a list of dicts
+        # on older DRF versions); normalize either shape
+        raw_errors = serializer.errors
+        items = raw_errors.items() if isinstance(raw_errors, dict) else enumerate(raw_errors)
+        errors = [{"index": idx, "errors": e} for idx, e in items if e]
+        return None, None, Response(
+            {"detail": "Validation errors", "errors": errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    validated = serializer.validated_data
+
+    # Map task titles to IDs for dependency resolution
+    title_to_id = {
+        t["title"]: str(t.get("id") or t["title"])
+        for t in validated
+    }
+
+    # Replace dependency titles with IDs in one comprehension per task,
+    # skipping tasks with no dependencies and deduplicating so a blocker
+    # listed twice is only counted once
+    for t in validated:
+        deps = t.get("dependencies")
+        if not deps:
+            continue
+        t["dependencies"] = list(dict.fromkeys(
+            title_to_id.get(d, str(d)) for d in deps
+        ))
+
+    # Detect circular dependencies and reject if found
+    cycles = detect_cycles(validated)
+    if cycles:
+        return None, None, Response(
+            {"detail": "Circular dependencies detected", "cycles": cycles},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # due_date is already a datetime.date here: the serializer's DateField
+    # parsed it during validation, so no re-parsing pass is needed
+    scored = compute_scores(validated, weights=weights, strategy=strategy,
+                            top_k=top_k, include_explanation=include_explanation)
+
+    return scored, validated, None
+
 
 class AnalyzeTasksAPIView(APIView):
 
     # API endpoint to analyze tasks and compute their priority scores.
     # Returns scored tasks, detected cycles, and dependency graph.
 
+    renderer_classes = [ORJSONRenderer]
+
     def post(self, request):
         payload = request.data
 
@@ -34,66 +91,10 @@ class AnalyzeTasksAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Validate each task using TaskSerializer
-
-        validated = []
-        errors = []
-
-        for idx, t in enumerate(raw_tasks):
-            s = TaskSerializer(data=t)
-            if s.is_valid():
-                validated.append(s.validated_data)
-            else:
-                errors.append({"index": idx, "errors": s.errors})
-
-        # If validation errors exist, return them
-        if errors:
-            return Response(
-                {"detail": "Validation errors", "errors": errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Map task titles to IDs for dependency resolution
-        title_to_id = {
-            t["title"]: str(t.get("id") or t["title"])
-            for t in validated
-        }
-
-        # Replace dependency titles with IDs
-        for t in validated:
-            deps = t.get("dependencies") or []
-            new_deps = []
-
-            for d in deps:
-                if d in title_to_id:
-                    new_deps.append(title_to_id[d])  
-                else:
-                    new_deps.append(str(d))
-
-            t["dependencies"] = new_deps
+        scored, validated, error = _prepare_and_score(raw_tasks, weights, strategy)
+        if error is not None:
+            return error
 
-        # Detect circular dependencies and reject if found
-        cycles = detect_cycles(validated)
-        if cycles:
-            return Response(
-                {"detail": "Circular dependencies detected", "cycles": cycles},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-         # Convert string due dates to datetime.date objects
-        for t in validated:
-            due = t.get("due_date")
-            if isinstance(due, str):
-                try:
-                    t["due_date"] = datetime.fromisoformat(due).date()
-                except:
-                    t["due_date"] = None
-
-        
-        # Compute scores for all tasks
-        scored = compute_scores(validated, weights=weights, strategy=strategy)
-
-        
         # Build a simple dependency graph (nodes and edges)
         all_ids = {task["id"] for task in scored}
 
@@ -102,25 +103,24 @@ class AnalyzeTasksAPIView(APIView):
             "edges": [
                 {"from": t["id"], "to": dep}
                 for t in scored
-                for dep in (t.get("dependencies") or [])
-                if dep in all_ids
+                for dep in all_ids.intersection(t.get("dependencies") or ())
             ]
         }
 
-        # Return scored tasks, any cycles, and the dependency graph
+        # Return scored tasks, any cycles (none past this point), and the graph
         return Response(
-            {"tasks": scored, "cycles": cycles, "graph": graph},
+            {"tasks": scored, "cycles": [], "graph": graph},
             status=status.HTTP_200_OK
         )
 
 
-
-
 class SuggestTasksAPIView(APIView):
-    
+
     # API endpoint to suggest top priority tasks (top 3 by score).
     # Returns the suggested tasks with explanation ('why').
 
+    renderer_classes = [ORJSONRenderer]
+
     def get(self, request):
 
         # GET is not allowed; instruct user to POST
@@ -144,63 +144,19 @@ class SuggestTasksAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Validate tasks
-        validated = []
-
-
-        errors = []
-        for idx, t in enumerate(raw_tasks):
-            serializer = TaskSerializer(data=t)
-            if serializer.is_valid():
-                validated.append(serializer.validated_data)
-            else:
-                errors.append({'index': idx, 'errors': serializer.errors})
-
-        if errors:
-            return Response(
-                {'detail': 'Validation errors', 'errors': errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Map task titles to IDs for dependency resolution
-        title_to_id = {t["title"]: str(t.get("id") or t["title"]) for t in validated}
-
-        # Update dependencies to use IDs
-        for t in validated:
-            deps = t.get("dependencies") or []
-            new_deps = []
-            for d in deps:
-                if d in title_to_id:
-                    new_deps.append(title_to_id[d])
-                else:
-                    new_deps.append(d)
-            t["dependencies"] = new_deps
-
-
-         # Detect circular dependencies
-        cycles = detect_cycles(validated)
-        if cycles:
-            return Response(
-                {'detail': 'Circular dependencies detected', 'cycles': cycles},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Convert string due dates to datetime.date objects
-        for t in validated:
-            due = t.get('due_date')
-            if isinstance(due, str):
-                try:
-                    t['due_date'] = datetime.fromisoformat(due).date()
-                except Exception:
-                    t['due_date'] = None
+        # Keep only the top 3 tasks as suggestions. Explanations stay on:
+        # the frontend renders each suggestion's meta line from them.
+        top3, validated, error = _prepare_and_score(raw_tasks, weights, strategy,
+                                                    top_k=3)
+        if error is not None:
+            return error
 
-        # Compute scores
-        scored = compute_scores(validated, weights=weights, strategy=strategy)
-
-        # Select top 3 tasks as suggestions
-        top3 = scored[:3]
         suggestions = []
 
+        # IDs that appear in any task's dependency list, computed once so the
+        # "blocking other tasks" check below is a set lookup per suggestion
+        blockers = {d for t in validated for d in (t.get('dependencies') or ())}
+
         for s in top3:
             reasons = []
             meta = s.get('_meta', {})
@@ -215,7 +171,7 @@ class SuggestTasksAPIView(APIView):
                 reasons.append('quick win (low effort)')
             if s.get('dependencies'):
                 reasons.append('has dependencies')
-            if s.get('id') and any([s['id'] in (t.get('dependencies') or []) for t in validated]):
+            if s.get('id') and s['id'] in blockers:
                 reasons.append('blocking other tasks')
 
             if not reasons: